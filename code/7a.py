@@ -51,42 +51,51 @@ print("=============================\n")
 start_time = time.time()
 
 start = [Int(f'start_{i}') for i in range(num_tasks)]
-machine = [Int(f'machine_{i}') for i in range(num_tasks)]
+assign = [[Bool(f'assign_{i}_{k}') for k in range(num_machines)] for i in range(num_tasks)]
 tardiness = [Int(f'tardiness_{i}') for i in range(num_tasks)]
 Cmax = Int('Cmax')
 
 s = Optimize()
+# pure QF_LIA model: name the logic instead of letting z3 infer it
+s.set('smt.logic', 'QF_LIA')
 
 for i in range(num_tasks):
     s.add(start[i] >= 0)
-    s.add(machine[i] >= 0, machine[i] < num_machines)
+    s.add(PbEq([(assign[i][k], 1) for k in range(num_machines)], 1))
     s.add(tardiness[i] >= 0)
 
 for i, j in precedences:
     s.add(start[i] + duration[i] <= start[j])
 
+# a sequential schedule always fits within the sum of the durations
+time_horizon = sum(duration)
 for i in range(num_tasks):
-    for j in range(i + 1, num_tasks):
-        s.add(Or(machine[i] != machine[j],
-                 start[i] + duration[i] <= start[j],
-                 start[j] + duration[j] <= start[i]))
+    s.add(start[i] + duration[i] <= time_horizon)
 
-time_horizon = sum(duration)
+# active[i][t] holds iff task i runs during time slot t
+active = [[Bool(f'active_{i}_{t}') for t in range(time_horizon)] for i in range(num_tasks)]
+for i in range(num_tasks):
+    for t in range(time_horizon):
+        s.add(active[i][t] == And(start[i] <= t, t < start[i] + duration[i]))
+
+# at most one task per machine per time slot
 for t in range(time_horizon):
-    s.add(Sum([If(And(start[i] <= t, t < start[i] + duration[i]), power[i], 0)
-               for i in range(num_tasks)]) <= Pmax)
+    for k in range(num_machines):
+        s.add(PbLe([(And(assign[i][k], active[i][t]), 1) for i in range(num_tasks)], 1))
+
+# power use is piecewise constant and only rises when a task starts, so the
+# budget holds everywhere iff it holds at every task start
+for i in range(num_tasks):
+    s.add(PbLe([(And(start[j] <= start[i], start[i] < start[j] + duration[j]), power[j])
+                for j in range(num_tasks)], Pmax))
 
 for i in range(num_tasks):
     s.add(tardiness[i] >= start[i] + duration[i] - deadline[i])
     s.add(tardiness[i] >= 0)
 
-def z3_max(lst):
-    if len(lst) == 1:
-        return lst[0]
-    else:
-        return If(lst[0] > z3_max(lst[1:]), lst[0], z3_max(lst[1:]))
-
-s.add(Cmax == z3_max([start[i] + duration[i] for i in range(num_tasks)]))
+# Cmax bounds every completion time; minimizing it makes it the max
+for i in range(num_tasks):
+    s.add(Cmax >= start[i] + duration[i])
 
 
 s.minimize(Cmax)
@@ -94,9 +103,11 @@ s.minimize(Sum(tardiness))
 
 if s.check() == sat:
     m = s.model()
+    machine = [next(k for k in range(num_machines) if is_true(m.evaluate(assign[i][k])))
+               for i in range(num_tasks)]
     print("Schedule found:")
     for i in range(num_tasks):
-        print(f"Task {i}: start={m[start[i]]}, machine={m[machine[i]]}, tardiness={m[tardiness[i]]}")
+        print(f"Task {i}: start={m[start[i]]}, machine={machine[i]}, tardiness={m[tardiness[i]]}")
     print(f"Max Completion Time: {m[Cmax]}")
     total_tardy = sum([m[tardiness[i]].as_long() for i in range(num_tasks)])
     print(f"Total Tardiness: {total_tardy}")
@@ -113,7 +124,7 @@ tasks = []
 for i in range(len(start)):
     start_time_task = m[start[i]].as_long()
     end_time_task = start_time_task + duration[i]
-    machine_id = m[machine[i]].as_long()
+    machine_id = machine[i]
     tasks.append((i, machine_id, start_time_task, end_time_task))
 
 
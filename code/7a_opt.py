@@ -49,27 +49,35 @@ print("=============================\n")
 start_time = time.time()
 
 start_vars = [Int(f'start_{i}') for i in range(num_tasks)]
-machine_vars = [Int(f'machine_{i}') for i in range(num_tasks)]
+assign_vars = [[Bool(f'assign_{i}_{k}') for k in range(num_machines)] for i in range(num_tasks)]
 tardiness_vars = [Int(f'tardiness_{i}') for i in range(num_tasks)]
 Cmax = Int('Cmax')
 
 s = Optimize()
+# pure QF_LIA model: name the logic instead of letting z3 infer it
+s.set('smt.logic', 'QF_LIA')
 
 for i in range(num_tasks):
     s.add(start_vars[i] >= 0)
-    s.add(machine_vars[i] >= 0, machine_vars[i] < num_machines)
+    s.add(PbEq([(assign_vars[i][k], 1) for k in range(num_machines)], 1))
     s.add(tardiness_vars[i] >= 0)
 
 for i, j in precedences:
     s.add(start_vars[i] + duration[i] <= start_vars[j])
 
+# a sequential schedule always fits within the sum of the durations
+time_horizon = sum(duration)
 for i in range(num_tasks):
-    for j in range(i+1, num_tasks):
-        s.add(Or(machine_vars[i] != machine_vars[j],
-                 start_vars[i] + duration[i] <= start_vars[j],
-                 start_vars[j] + duration[j] <= start_vars[i]))
+    s.add(start_vars[i] + duration[i] <= time_horizon)
+
+# at most one task per machine per time slot
+for t in range(time_horizon):
+    for k in range(num_machines):
+        s.add(PbLe([
+            (And(assign_vars[i][k], start_vars[i] <= t, t < start_vars[i] + duration[i]), 1)
+            for i in range(num_tasks)
+        ], 1))
 
-time_horizon = sum(duration)
 for t in range(time_horizon):
     s.add(Sum([
         If(And(start_vars[i] <= t, t < start_vars[i] + duration[i]), power[i], 0)
@@ -83,28 +91,25 @@ for i in range(num_tasks):
 for i in range(num_tasks):
     s.add(Cmax >= start_vars[i] + duration[i])
 
+# lexicographic objectives: Cmax first, then total tardiness, in a single check
+s.set('priority', 'lex')
 h1 = s.minimize(Cmax)
+h2 = s.minimize(Sum(tardiness_vars))
 
 if s.check() == sat:
     m = s.model()
-    best_Cmax = m[Cmax].as_long()
-    print(f"Phase 1: Best Cmax = {best_Cmax}")
-
-    s.add(Cmax == best_Cmax)
-    h2 = s.minimize(Sum(tardiness_vars))
-
-    if s.check() == sat:
-        m = s.model()
-        print("\nOptimal Schedule Found:")
-        for i in range(num_tasks):
-            print(f"Task {i}: start={m[start_vars[i]]}, machine={m[machine_vars[i]]}, tardiness={m[tardiness_vars[i]]}")
-        total_tardy = sum([m[tardiness_vars[i]].as_long() for i in range(num_tasks)])
-        print(f"Max Completion Time: {m[Cmax]}")
-        print(f"Total Tardiness: {total_tardy}")
-    else:
-        print("No feasible schedule found in Phase 2.")
+    print(f"Best Cmax = {h1.value()}")
+
+    machine_of = [next(k for k in range(num_machines) if is_true(m.evaluate(assign_vars[i][k])))
+                  for i in range(num_tasks)]
+    print("\nOptimal Schedule Found:")
+    for i in range(num_tasks):
+        print(f"Task {i}: start={m[start_vars[i]]}, machine={machine_of[i]}, tardiness={m[tardiness_vars[i]]}")
+    total_tardy = sum([m[tardiness_vars[i]].as_long() for i in range(num_tasks)])
+    print(f"Max Completion Time: {m[Cmax]}")
+    print(f"Total Tardiness: {total_tardy}")
 else:
-    print("No feasible schedule found in Phase 1.")
+    print("No feasible schedule found.")
 
 end_time = time.time()
 print(f"Elapsed time: {end_time - start_time:.6f} seconds")
@@ -116,7 +121,7 @@ tasks = []
 for i in range(num_tasks):
     start = m[start_vars[i]].as_long()
     end = start + duration[i]
-    machine = m[machine_vars[i]].as_long()
+    machine = machine_of[i]
     tasks.append((i, machine, start, end))
 
 
@@ -17,57 +17,64 @@ cost = [30, 30]
 N_canvas = 2  # number of canvases
 N_poster = 12  # number of poster
 
+# (canvas, poster) pairs where the poster fits in at least one orientation;
+# variables are only created for these, so impossible placements never reach Z3
+feasible = [(c, p) for c in range(N_canvas) for p in range(N_poster)
+            if (w[p] <= W[c] and h[p] <= H[c]) or (h[p] <= W[c] and w[p] <= H[c])]
+
 # posters are printed or not
-z = [[Bool(f"z_{c}_{p}") for p in range(N_poster)] for c in range(N_canvas)]
+z = {(c, p): Bool(f"z_{c}_{p}") for c, p in feasible}
 
 # Bottom-left coordinates
-x = [[Int(f"x_{c}_{p}") for p in range(N_poster)] for c in range(N_canvas)]
-y = [[Int(f"y_{c}_{p}") for p in range(N_poster)] for c in range(N_canvas)]
+x = {(c, p): Int(f"x_{c}_{p}") for c, p in feasible}
+y = {(c, p): Int(f"y_{c}_{p}") for c, p in feasible}
 
 # posters rotate 90° or not
-r = [[Bool(f"r_{c}_{p}") for p in range(N_poster)] for c in range(N_canvas)]
+r = {(c, p): Bool(f"r_{c}_{p}") for c, p in feasible}
+
+# effective width and height after rotation
+we = {(c, p): Int(f"we_{c}_{p}") for c, p in feasible}
+he = {(c, p): Int(f"he_{c}_{p}") for c, p in feasible}
 
 # canvases are used or not
 u = [Bool(f"u_{c}") for c in range(N_canvas)]
 
 s = Optimize()
+# pure QF_LIA model: name the logic instead of letting z3 infer it
+s.set('smt.logic', 'QF_LIA')
 
 # constraint
 
 # a poster is printed at most once
 for i in range(N_poster):
-    s.add(Sum([If(z[p][i], 1, 0) for p in range(N_canvas)]) <= 1)
+    placements = [z[c, i] for c in range(N_canvas) if (c, i) in z]
+    if len(placements) > 1:
+        s.add(Sum([If(b, 1, 0) for b in placements]) <= 1)
+
+# rotation decides the effective size once per poster and canvas
+for c, p in feasible:
+    s.add(If(r[c, p],
+             And(we[c, p] == h[p], he[c, p] == w[p]),
+             And(we[c, p] == w[p], he[c, p] == h[p])))
 
 # fit in canvas
-for c in range(N_canvas):
-    for p in range(N_poster):
-        s.add(Implies(z[c][p], Or(
-            And(r[c][p] == False,
-                x[c][p] >= 0,
-                y[c][p] >= 0,
-                x[c][p] + w[p] <= W[c],
-                y[c][p] + h[p] <= H[c]),
-            And(r[c][p] == True,
-                x[c][p] >= 0,
-                y[c][p] >= 0,
-                x[c][p] + h[p] <= W[c],
-                y[c][p] + w[p] <= H[c])
-        )))
+for c, p in feasible:
+    s.add(Implies(z[c, p], And(
+        x[c, p] >= 0,
+        y[c, p] >= 0,
+        x[c, p] + we[c, p] <= W[c],
+        y[c, p] + he[c, p] <= H[c])))
 
 # no overlap and rotate
 for c in range(N_canvas):
     for i in range(N_poster):
         for j in range(i+1, N_poster):
-            
-            # efficient height and width
-            w_eff_i = If(r[c][i], h[i], w[i])
-            h_eff_i = If(r[c][i], w[i], h[i])
-            w_eff_j = If(r[c][j], h[j], w[j])
-            h_eff_j = If(r[c][j], w[j], h[j])
+            if (c, i) not in z or (c, j) not in z:
+                continue
 
-            s.add(Implies(And(z[c][i], z[c][j]),
-                Or(x[c][i] + w_eff_i <= x[c][j], x[c][j] + w_eff_j <= x[c][i],
-                   y[c][i] + h_eff_i <= y[c][j], y[c][j] + h_eff_j <= y[c][i])))
+            s.add(Implies(And(z[c, i], z[c, j]),
+                Or(x[c, i] + we[c, i] <= x[c, j], x[c, j] + we[c, j] <= x[c, i],
+                   y[c, i] + he[c, i] <= y[c, j], y[c, j] + he[c, j] <= y[c, i])))
             
             '''
             b_left  = Bool(f"left_{c}_{i}_{j}")
@@ -89,20 +96,23 @@ for c in range(N_canvas):
             s.add(Implies(And(z[c][i], z[c][j], b_above), y[c][j] + h_eff_j <= y[c][i]))
             '''
 
-# not fit in any canvases
-for c in range(N_canvas):
-    for p in range(N_poster):
-        if (w[p] > W[c] and h[p] > W[c]) or (h[p] > H[c] and w[p] > H[c]):
-            s.add(z[c][p] == False)
-
 # associate canvas and poster
-for c in range(N_canvas):
+for c, p in feasible:
+    s.add(Implies(z[c, p], u[c]))
+
+# symmetry breaking: of two identical canvases, the earlier one holds the
+# lowest-numbered printed poster (and so is used whenever the later one is)
+for c in range(N_canvas - 1):
+    if (W[c], H[c], cost[c]) != (W[c+1], H[c+1], cost[c+1]):
+        continue
+    s.add(Implies(u[c+1], u[c]))
     for p in range(N_poster):
-        s.add(Implies(z[c][p], u[c]))
+        if (c+1, p) in z:
+            s.add(Implies(z[c+1, p], Or([z[c, q] for q in range(p) if (c, q) in z])))
 
 # calculate profit
 
-total_profit = Sum([If(z[c][p], price[p], 0) for c in range(N_canvas) for p in range(N_poster)]) \
+total_profit = Sum([If(z[c, p], price[p], 0) for c, p in feasible]) \
                - Sum([If(u[c], cost[c], 0) for c in range(N_canvas)])
 h_opt = s.maximize(total_profit)
 
@@ -115,13 +125,13 @@ print("check() ->", res)
 if res == sat:
     m = s.model()
     for c in range(N_canvas):
-        assigned = [p for p in range(N_poster) if m.evaluate(z[c][p]) == True]
+        assigned = [p for p in range(N_poster) if (c, p) in z and m.evaluate(z[c, p]) == True]
         if assigned:
             print(f"\nPrinter {c} (W={W[c]}, H={H[c]}, cost={cost[c]}):")
             for p in assigned:
-                xi = m.evaluate(x[c][p])
-                yi = m.evaluate(y[c][p])
-                rot = m.evaluate(r[c][p])
+                xi = m.evaluate(x[c, p])
+                yi = m.evaluate(y[c, p])
+                rot = m.evaluate(r[c, p])
                 print(f"  Poster {p}: size=({w[p]}x{h[p]}), price={price[p]}, "
                       f"rotated={rot}, at=({xi},{yi})")
     print("\ntotal profit =", m.evaluate(total_profit))
@@ -3,34 +3,40 @@ import time
 
 start = time.time()
 
-x = x0
 x0 = BitVec('x0', 32)
+x = x0
 y = BitVecVal(1, 32)
 
 
 xlist = [x]
 ylist = [y]
+# unsigned carry-out predicate of every x + y step
+no_overflow = []
 
 for i in range(15):
+    no_overflow.append(BVAddNoOverflow(x, y, False))
     x = x + y
     y = 2 * y + 1
     xlist.append(x)
     ylist.append(y)
 
-s = Solver()
-
+s = Tactic('qfbv').solver()
+s.set('sat.phase', 'caching')
 
+# loop bounds are shared by every query on this solver
 s.add(ULT(xlist[14], BitVecVal(10**9, 32)))   
 s.add(UGE(xlist[15], BitVecVal(10**9, 32)))   
 
-
-s.add(ULT(x, x0))  
+# the overflow property is scoped so the solver can be reused for other checks
+s.push()
+s.add(Not(And(no_overflow)))
 
 if s.check() == sat:
     m = s.model()
     print("Overflow detected:", m)
 else:
     print("No overflow or underflow within 15 iterations.")
+s.pop()
 
 end = time.time()
 print("Runtime:", end - start, "seconds")
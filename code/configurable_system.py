@@ -1,10 +1,16 @@
+import io
+import re
 import sys
 import random
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from itertools import combinations
 from typing import List, Tuple, Dict, Optional, Set
 from multiprocessing import cpu_count
 
+import numpy as np
+
 try:
     from tqdm import tqdm
 except ImportError:
@@ -12,30 +18,87 @@ except ImportError:
 
 from oxidd.bdd import BDDManager
 
+# Maps every byte to its lowest bit, turning random bytes into random 0/1 values.
+_LOW_BIT = bytes(b & 1 for b in range(256))
+
+_HEADER_RE = re.compile(r'^[ \t]*p[ \t]+cnf[ \t]+(\d+)', re.M)
+_VAR_ORDER_RE = re.compile(r'^[ \t]*c vo (.*)$', re.M)
+_NON_CLAUSE_LINE_RE = re.compile(r'^[ \t]*[cp%].*$', re.M)
+
+def _parse_clause_lines(body: str) -> List[List[int]]:
+    # One clause per line, zeros dropped, lines with a non-integer token skipped.
+    clauses = []
+    for line in body.splitlines():
+        try:
+            literals = [int(lit) for lit in line.split() if lit != '0']
+            if literals: clauses.append(literals)
+        except ValueError: pass
+    return clauses
+
+def _one_clause_per_line(body: str, zero_count: int) -> bool:
+    # True when every non-blank line ends in a standalone 0 and holds no other 0.
+    buf = np.frombuffer(body.encode('latin-1'), dtype=np.uint8)
+    newline = buf == 10
+    blank = newline | (buf == 32) | (buf == 9) | (buf == 13)
+    filled = np.flatnonzero(~blank)
+    line_starts = np.concatenate(([0], np.flatnonzero(newline) + 1))
+    # Last non-blank byte before each line end, kept if it lies on that line
+    k = np.searchsorted(filled, np.append(line_starts[1:] - 1, buf.size)) - 1
+    seen = k >= 0
+    last = filled[k[seen]]
+    last = last[last >= line_starts[seen]]
+    if last.size != zero_count: return False
+    if not np.all(buf[last] == 48): return False
+    # ... and is a whole token, not the tail of 10, -0, ...
+    return bool(np.all(blank[last[last > 0] - 1]))
+
 def parse_dimacs(file_path: Path) -> Tuple[int, List[List[int]], Optional[List[int]]]:
-    num_vars, clauses, var_order = 0, [], None
-    with open(file_path, 'r', encoding='latin-1') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('%'): continue
-            if line.startswith('c'):
-                if line.startswith('c vo '): var_order = [int(v) for v in line[5:].strip().split()]
-                continue
-            if line.startswith('p cnf'):
-                parts = line.split(); num_vars = int(parts[2]); continue
-            try:
-                literals = [int(lit) for lit in line.split() if lit != '0']
-                if literals: clauses.append(literals)
-            except ValueError: pass
+    text = Path(file_path).read_text(encoding='latin-1')
+    header = _HEADER_RE.search(text)
+    num_vars = int(header.group(1)) if header else 0
+    vo = _VAR_ORDER_RE.search(text)
+    var_order = [int(v) for v in vo.group(1).split()] if vo else None
+
+    # Tokenize all clause lines in one C-level pass, then cut at the 0 terminators.
+    body = _NON_CLAUSE_LINE_RE.sub('', text)
+    try:
+        lits = np.fromstring(body, dtype=np.int64, sep=' ')
+    except ValueError:
+        lits = None
+    # The cut only matches the line-by-line reading when every non-blank line is
+    # one clause ending in its only 0; anything else goes through the slow parser.
+    if lits is None or not _one_clause_per_line(body, int(np.count_nonzero(lits == 0))):
+        return num_vars, _parse_clause_lines(body), var_order
+    ends = np.flatnonzero(lits == 0)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    # Clauses stay plain int lists: the BDD build iterates them literal by literal.
+    flat = lits.tolist()
+    clauses = [flat[s:e] for s, e in zip(starts.tolist(), ends.tolist()) if e > s]
     return num_vars, clauses, var_order
 
+# Analyzer rebuilt once per worker process; oxidd BDDs cannot be pickled.
+_worker_analyzer = None
+
+def _init_pairs_worker(file_path: Path):
+    global _worker_analyzer
+    with redirect_stdout(io.StringIO()):
+        # One BDD thread per worker: the workers already use every core between them
+        _worker_analyzer = ConfigSystemAnalyzer(file_path, threads=1)
+
+def _pairs_worker(rows: List[int]):
+    return _worker_analyzer._pairs_for_rows(rows)
+
 class ConfigSystemAnalyzer:
-    def __init__(self, file_path: Path):
+    def __init__(self, file_path: Path, threads: Optional[int] = None, workers: int = 1):
         self.file_path = file_path
+        # Opt-in: with workers > 1 the pair universe for (iv)/(v) is split over that
+        # many processes. Each one rebuilds the BDD from the file first, so this only
+        # pays off when the pair loop takes much longer than the build.
+        self.workers = workers
         self.num_vars, self.clauses, var_order = parse_dimacs(self.file_path)
         print(f"Parsing complete: {self.num_vars} variables, {len(self.clauses)} clauses.")
 
-        self.manager = BDDManager(2**26, 2**24, cpu_count())
+        self.manager = BDDManager(2**26, 2**24, threads or cpu_count())
         self.manager.add_vars(self.num_vars)
         self.vars_list = [self.manager.var(i) for i in range(self.num_vars)]
 
@@ -49,20 +112,47 @@ class ConfigSystemAnalyzer:
             print("No variable order detected, using default order.")
         
         self.phi_bdd = self._build_bdd()
+        self._pair_universe = None
+        # Model counts keyed by BDD node; oxidd functions hash by node, so the
+        # cache is shared by every sample and every restricted BDD in (v).
+        self._sat_count_cache = {}
+        # Branch data per BDD node for the sampler, see _branch.
+        self._branch_cache = {}
 
     def _build_bdd(self):
         print("Building BDD...")
-        phi = self.manager.true()
-        for clause in tqdm(self.clauses, desc="Processing clauses"):
-            clause_bdd = self.manager.false()
-            for lit in clause:
-                var_index = abs(lit) - 1
-                if 0 <= var_index < self.num_vars:
-                    var_node = self.vars_list[var_index]
-                    clause_bdd |= var_node if lit > 0 else ~var_node
-            phi &= clause_bdd
+        # Sort clauses by their topmost variable so that neighbours in the reduction
+        # tree share support and conjoin into small intermediate BDDs.
+        var_level = [self.manager.var_to_level(v) for v in range(self.num_vars)]
+        def top_level(clause):
+            return min((var_level[abs(lit) - 1] for lit in clause if 0 < abs(lit) <= self.num_vars),
+                       default=self.num_vars)
+        level, seen_clauses = [], set()
+        for clause in tqdm(sorted(self.clauses, key=top_level), desc="Processing clauses"):
+            key = tuple(sorted(clause))
+            # phi & c & c == phi & c, so a repeated clause adds nothing to the conjunction
+            if key in seen_clauses: continue
+            seen_clauses.add(key)
+            if len(clause) == 1 and 0 < abs(clause[0]) <= self.num_vars:
+                var_node = self.vars_list[abs(clause[0]) - 1]
+                clause_bdd = var_node if clause[0] > 0 else ~var_node
+            else:
+                clause_bdd = self.manager.false()
+                for lit in clause:
+                    var_index = abs(lit) - 1
+                    if 0 <= var_index < self.num_vars:
+                        var_node = self.vars_list[var_index]
+                        clause_bdd |= var_node if lit > 0 else ~var_node
+            level.append(clause_bdd)
+
+        # Conjoin neighbouring BDDs pairwise until one is left: intermediate results
+        # stay small instead of every clause being ANDed into one growing BDD.
+        while len(level) > 1:
+            paired = [level[k] & level[k + 1] for k in range(0, len(level) - 1, 2)]
+            if len(level) % 2: paired.append(level[-1])
+            level = paired
         print("BDD construction complete.")
-        return phi
+        return level[0] if level else self.manager.true()
 
     def report_i_bdd_nodes(self):
         node_count = self.phi_bdd.node_count()
@@ -80,38 +170,57 @@ class ConfigSystemAnalyzer:
         print(f"(ii) Total valid configurations |V|: {count_str}")
         return count
     
+    def _sat_count(self, node):
+        # Counting over all num_vars (instead of the levels below the node) only
+        # scales both children by the same power of two, so the low/high ratio
+        # is unchanged and one count per node can be reused across levels.
+        count = self._sat_count_cache.get(node)
+        if count is None:
+            count = node.sat_count(self.num_vars)
+            self._sat_count_cache[node] = count
+        return count
+
+    def _branch(self, node):
+        # (var, low, high, low_count, high_count) of an inner node, None at a terminal.
+        # var is the variable index, not the level: with a `c vo` order the two differ,
+        # and every reader of a sample indexes it by variable.
+        # Nodes near the root are visited by every sample, so the FFI calls for
+        # cofactors and counts are made once per node instead of once per visit.
+        if node in self._branch_cache:
+            return self._branch_cache[node]
+        var = node.node_var()
+        if var is None:
+            branch = None
+        else:
+            low, high = node.cofactor_false(), node.cofactor_true()
+            branch = (var, low, high, self._sat_count(low), self._sat_count(high))
+        self._branch_cache[node] = branch
+        return branch
+
     def _sample_one_uniform(self, bdd_func):
         if not bdd_func.satisfiable(): return None
-        assignment = [0] * self.num_vars
+        # Variables skipped by the path are don't-cares, so pre-fill every position
+        # with a random bit in one C-level call and overwrite the visited ones.
+        assignment = bytearray(random.randbytes(self.num_vars).translate(_LOW_BIT))
         current = bdd_func
-        processed_levels = set()
 
-        while not (current == self.manager.true() or current == self.manager.false()):
-            var_level = current.node_level()
-            if var_level is None:
+        while True:
+            branch = self._branch(current)
+            if branch is None:
                 break
-
-            low = current.cofactor_false()
-            high = current.cofactor_true()
-            
-            remaining_vars_count = self.num_vars - var_level - 1
-            low_count = low.sat_count(remaining_vars_count)
-            high_count = high.sat_count(remaining_vars_count)
+            var, low, high, low_count, high_count = branch
             total = low_count + high_count
             if total == 0: return None
 
             if random.randrange(total) < low_count:
-                assignment[var_level] = 0
+                assignment[var] = 0
                 current = low
             else:
-                assignment[var_level] = 1
+                assignment[var] = 1
                 current = high
-            processed_levels.add(var_level)
-
-        for i in range(self.num_vars):
-            if i not in processed_levels:
-                assignment[i] = random.randint(0, 1)
-        return tuple(assignment)
+        # One byte per variable: hashing in the URS sample set is a single pass
+        # over contiguous memory instead of over a tuple of Python ints.
+        return bytes(assignment)
 
     def report_iii_urs_ratio(self, k=10000, var_index_1_based=42):
         print(f"Starting Uniform Random Sampling (URS) for {k} samples...")
@@ -139,40 +248,70 @@ class ConfigSystemAnalyzer:
         print(f"(iii) Selection ratio for x{var_index_1_based} (k={len(samples)}): k1/k0 = {ratio_str}")
         return ratio_str
 
+    def _pairs_for_rows(self, rows):
+        phi, pairs = self.phi_bdd, []
+        # literals[v][val]: negative/positive literal of v, built once instead of per pair
+        literals = [(~var, var) for var in self.vars_list]
+        # lit_ok[v][val]: phi has a model with v = val. A variable with a single such
+        # value is forced, so phi & lit == phi and the pair reduces to the other literal.
+        lit_ok = [((phi & neg).satisfiable(), (phi & pos).satisfiable()) for neg, pos in literals]
+        forced = [not (neg_ok and pos_ok) for neg_ok, pos_ok in lit_ok]
+        for i in rows:
+            ok_i = lit_ok[i]
+            # phi restricted by each literal of i, shared by every partner j of the row
+            restr_i = [phi & lit for lit in literals[i]]
+            for j in range(i + 1, self.num_vars):
+                lits_j, ok_j = literals[j], lit_ok[j]
+                known = forced[i] or forced[j]
+                # val_i/val_j: 0 for false, 1 for true; i < j keeps pairs canonical
+                for val_i in (0, 1):
+                    if not ok_i[val_i]: continue
+                    for val_j in (0, 1):
+                        if not ok_j[val_j]: continue
+                        if known or (restr_i[val_i] & lits_j[val_j]).satisfiable():
+                            pairs.append(((i, val_i), (j, val_j)))
+        return pairs
+
+    def _pairwise_universe(self):
+        # Both (iv) and (v) need the same set of valid pairs, so compute it once.
+        if self._pair_universe is not None: return self._pair_universe
+        workers = min(self.workers, self.num_vars)
+        if workers > 1:
+            # Rows are dealt round-robin since row i has num_vars - i - 1 partners.
+            shards = [range(k, self.num_vars, workers) for k in range(workers)]
+            with ProcessPoolExecutor(workers, initializer=_init_pairs_worker, initargs=(self.file_path,)) as pool:
+                shards = tqdm(pool.map(_pairs_worker, shards), total=workers, desc="Generating pairs")
+                # Same (i, j, val_i, val_j) order as the serial loop
+                universe = sorted((pair for shard in shards for pair in shard),
+                                  key=lambda p: (p[0][0], p[1][0], p[0][1], p[1][1]))
+        else:
+            universe = self._pairs_for_rows(tqdm(range(self.num_vars), desc="Generating pairs"))
+        self._pair_universe = universe
+        return universe
+
     def report_iv_pairwise_interactions(self):
         print("Calculating all valid pairwise interactions...")
-        total_interactions = 0
-        for i in tqdm(range(self.num_vars), desc="Calculating pairs"):
-            for j in range(i + 1, self.num_vars):
-                var_i, var_j = self.vars_list[i], self.vars_list[j]
-                if (self.phi_bdd & var_i & var_j).satisfiable(): total_interactions += 1
-                if (self.phi_bdd & var_i & ~var_j).satisfiable(): total_interactions += 1
-                if (self.phi_bdd & ~var_i & var_j).satisfiable(): total_interactions += 1
-                if (self.phi_bdd & ~var_i & ~var_j).satisfiable(): total_interactions += 1
+        total_interactions = len(self._pairwise_universe())
         print(f"(iv) Total valid pairwise interactions: {total_interactions:,}")
         return total_interactions
 
     def report_v_pairwise_cover_size(self):
         print("Generating pairwise interaction cover set using a greedy algorithm...")
-        uncovered, cover_set = set(), []
+        cover_set = []
         print("  - Generating the universe of pairs to cover...")
-        for i in tqdm(range(self.num_vars), desc="Generating pairs"):
-            for j in range(i + 1, self.num_vars):
-                var_i, var_j = self.vars_list[i], self.vars_list[j]
-                # val_i/val_j: 0 for false, 1 for true
-                for val_i, lit_i in enumerate((~var_i, var_i)):
-                    for val_j, lit_j in enumerate((~var_j, var_j)):
-                        if (self.phi_bdd & lit_i & lit_j).satisfiable():
-                            # Ensure a canonical representation for the pair to avoid duplicates.
-                            p1, p2 = (i, val_i), (j, val_j)
-                            uncovered.add(tuple(sorted((p1, p2))))
+        universe = self._pairwise_universe()
         
-        if not uncovered: print("(v) Pairwise cover set size |B|: 0"); return 0
+        if not universe: print("(v) Pairwise cover set size |B|: 0"); return 0
+
+        # One array per pair field, holding only the pairs no configuration covers yet.
+        # Covered pairs are dropped in order, so the next pair to cover is always at
+        # index 0 and each pass only touches what is still uncovered.
+        is_arr, vi_arr, js_arr, vj_arr = np.array(
+            [(i, val_i, j, val_j) for (i, val_i), (j, val_j) in universe], dtype=np.int32).T
 
-        pbar = tqdm(total=len(uncovered), desc="Building cover set")
-        while uncovered:
-            pair_to_cover = next(iter(uncovered))
-            (i, val_i), (j, val_j) = pair_to_cover
+        pbar = tqdm(total=len(universe), desc="Building cover set")
+        while is_arr.size:
+            i, val_i, j, val_j = is_arr[0], vi_arr[0], js_arr[0], vj_arr[0]
             lit_i = self.vars_list[i] if val_i else ~self.vars_list[i]
             lit_j = self.vars_list[j] if val_j else ~self.vars_list[j]
             restricted_bdd = self.phi_bdd & lit_i & lit_j
@@ -181,17 +320,14 @@ class ConfigSystemAnalyzer:
             
             if solution:
                 cover_set.append(solution)
-                covered_by_new = set()
-                for p in uncovered:
-                    (p_i, p_val_i), (p_j, p_val_j) = p
-                    if solution[p_i] == p_val_i and solution[p_j] == p_val_j:
-                        covered_by_new.add(p)
-                
-                update_amount = len(covered_by_new)
-                uncovered -= covered_by_new
-                pbar.update(update_amount)
+                values = np.frombuffer(solution, dtype=np.int8)
+                keep = (values[is_arr] != vi_arr) | (values[js_arr] != vj_arr)
+                update_amount = is_arr.size - int(np.count_nonzero(keep))
+                is_arr, vi_arr, js_arr, vj_arr = is_arr[keep], vi_arr[keep], js_arr[keep], vj_arr[keep]
             else:
-                 uncovered.remove(pair_to_cover); pbar.update(1)
+                is_arr, vi_arr, js_arr, vj_arr = is_arr[1:], vi_arr[1:], js_arr[1:], vj_arr[1:]
+                update_amount = 1
+            pbar.update(update_amount)
         pbar.close()
 
         size_B = len(cover_set)
@@ -12,93 +12,120 @@ couple_of = {2*h: h for h in range(H)}
 couple_of.update({2*h+1: h for h in range(H)})
 house_members = {h: (2*h, 2*h+1) for h in range(H)}
 
-def solve_instance(require_p1=False, require_p2=False, require_p3=False, require_p4=False, timeout_ms=None):
-    # serve[h][k] = True if house h hosts course k
-    serve = [[Bool(f"serve_{h}_{k}") for k in range(T)] for h in range(H)]
-    # attend[p][k] = h when people p attends course k at house h
-    attend = [[Int(f"attend_{p}_{k}") for k in range(T)] for p in range(N)]
-
-    s = Solver()
-    if timeout_ms is not None:
-        s.set("timeout", timeout_ms)
-
-    # People attendance must be a valid house number
-    for p in range(N):
+class DinnerEncoder:
+    """Shared dinner encoding; each scenario's properties are checked inside a push/pop scope."""
+
+    def __init__(self, timeout_ms=None, threads=None):
+        # serve[h][k] = True if house h hosts course k
+        self.serve = serve = [[Bool(f"serve_{h}_{k}") for k in range(T)] for h in range(H)]
+        # attend[p][k][h] = True when people p attends course k at house h (one-hot over h)
+        self.attend = attend = [[[Bool(f"attend_{p}_{k}_{h}") for h in range(H)] for k in range(T)] for p in range(N)]
+
+        self.s = s = Solver()
+        if timeout_ms is not None:
+            s.set("timeout", timeout_ms)
+        # Opt-in: z3 runs this many SMT workers in parallel and takes the first answer.
+        # On the easy scenarios the extra workers only add start-up cost.
+        if threads is not None and threads > 1:
+            s.set("threads", threads)
+
+        # Each course is hosted in exactly 2 houses; each house hosts exactly 2 courses
         for k in range(T):
-            s.add(attend[p][k] >= 0, attend[p][k] < H)
-
-    # Each course is hosted in exactly 2 houses; each house hosts exactly 2 courses
-    for k in range(T):
-        s.add(Sum([If(serve[h][k], 1, 0) for h in range(H)]) == 2)
-    for h in range(H):
-        s.add(Sum([If(serve[h][k], 1, 0) for k in range(T)]) == 2)
-
-    # Couples must attend their own house when hosting
-    for h in range(H):
-        a, b = house_members[h]
-        for k in range(T):
-            s.add(Implies(serve[h][k], attend[a][k] == h))
-            s.add(Implies(serve[h][k], attend[b][k] == h))
-
-    # Each person attends exactly one house per course
-    for p in range(N):
-        for k in range(T):
-            s.add(Sum([If(attend[p][k] == h, 1, 0) for h in range(H)]) == 1)
+            s.add(PbEq([(serve[h][k], 1) for h in range(H)], 2))
+        for h in range(H):
+            s.add(PbEq([(serve[h][k], 1) for k in range(T)], 2))
 
-    # A person can only attend a house if that house is hosting the course
-    for p in range(N):
-        for k in range(T):
-            for h in range(H):
-                s.add(Implies(attend[p][k] == h, serve[h][k]))
+        # Couples must attend their own house when hosting
+        for h in range(H):
+            a, b = house_members[h]
+            for k in range(T):
+                s.add(Implies(serve[h][k], attend[a][k][h]))
+                s.add(Implies(serve[h][k], attend[b][k][h]))
 
-    # 6. Each hosting house must have exactly 5 people (couple + 3 guests)
-    for h in range(H):
-        for k in range(T):
-            s.add(Sum([If(attend[p][k] == h, 1, 0) for p in range(N)]) == If(serve[h][k], 5, 0))
+        # Each person attends exactly one house per course
+        for p in range(N):
+            for k in range(T):
+                s.add(PbEq([(attend[p][k][h], 1) for h in range(H)], 1))
 
-    # 7. property 4: Distinct guests
-    for h in range(H):
-        members = set(house_members[h])
+        # A person can only attend a house if that house is hosting the course
         for p in range(N):
-            if p in members:
-                continue
-            s.add(Sum([If(And(serve[h][k], attend[p][k] == h), 1, 0) for k in range(T)]) <= (1 if require_p4 else 2))
+            for k in range(T):
+                for h in range(H):
+                    s.add(Implies(attend[p][k][h], serve[h][k]))
 
-    # 8. property 3: Couples never meet outside their own house
-    if require_p3:
+        # 6. Each hosting house must have exactly 5 people (couple + 3 guests);
+        # a house that does not host has nobody, by the constraint above
         for h in range(H):
-            a, b = house_members[h]
             for k in range(T):
-                s.add(Implies(attend[a][k] == attend[b][k], attend[a][k] == h))
-
-    # 9. Meeting counts between each two people
-    meet = {}
-    for i, j in itertools.combinations(range(N), 2):
-        meet[(i,j)] = Sum([If(attend[i][k] == attend[j][k], 1, 0) for k in range(T)])
-        # each pair meets at most 4 times
-        s.add(meet[(i,j)] <= 4)
-
-    # 10. property 1: Each pair meets at least once
-    if require_p1:
-        for (i,j), m in meet.items():
-            s.add(m >= 1)
-
-    # 11. property 2: Each pair meets at most 3 times
-    if require_p2:
-        for (i,j), m in meet.items():
-            s.add(m <= 3)
-
-    
-    t0 = time.perf_counter()
-    ok = s.check()
-    t1 = time.perf_counter()
-    runtime = t1 - t0
-
-    if ok == sat:
-        m = s.model()
+                s.add(Implies(serve[h][k], PbEq([(attend[p][k][h], 1) for p in range(N)], 5)))
+
+        # 7. A guest visits the same house at most twice (property 4 tightens this to once)
+        for h in range(H):
+            for p in self._guests(h):
+                s.add(PbLe([(attend[p][k][h], 1) for k in range(T)], 2))
+
+        # 9. Meeting counts between each two people: meet[(i,j)][k] is True when i and j
+        # attend course k at the same house
+        self.meet = meet = {}
+        for i, j in itertools.combinations(range(N), 2):
+            meet[(i,j)] = [Or([And(attend[i][k][h], attend[j][k][h]) for h in range(H)]) for k in range(T)]
+            # each pair meets at most 4 times
+            s.add(PbLe([(m, 1) for m in meet[(i,j)]], 4))
+
+    @staticmethod
+    def _guests(h):
+        members = set(house_members[h])
+        return [p for p in range(N) if p not in members]
+
+    def solve(self, require_p1=False, require_p2=False, require_p3=False, require_p4=False):
+        s, attend, meet = self.s, self.attend, self.meet
+        # Property constraints are scoped so the shared encoding (and what z3 learned
+        # about it) is kept for the next scenario.
+        s.push()
+        try:
+            # 7. property 4: Distinct guests
+            if require_p4:
+                for h in range(H):
+                    for p in self._guests(h):
+                        s.add(PbLe([(attend[p][k][h], 1) for k in range(T)], 1))
+
+            # 8. property 3: Couples never meet outside their own house
+            if require_p3:
+                for h in range(H):
+                    a, b = house_members[h]
+                    for k in range(T):
+                        for g in range(H):
+                            if g != h:
+                                s.add(Not(And(attend[a][k][g], attend[b][k][g])))
+
+            # 10. property 1: Each pair meets at least once
+            if require_p1:
+                for (i,j), m in meet.items():
+                    s.add(PbGe([(mk, 1) for mk in m], 1))
+
+            # 11. property 2: Each pair meets at most 3 times
+            if require_p2:
+                for (i,j), m in meet.items():
+                    s.add(PbLe([(mk, 1) for mk in m], 3))
+
+            t0 = time.perf_counter()
+            ok = s.check()
+            t1 = time.perf_counter()
+            runtime = t1 - t0
+
+            if ok == sat:
+                return self._solution(s.model(), runtime)
+            return {"sat": False, "status": ok, "runtime": runtime}
+        finally:
+            s.pop()
+
+    def _solution(self, m, runtime):
+        serve, attend = self.serve, self.attend
+        attend_matrix = [[next(h for h in range(H) if is_true(m.evaluate(attend[p][k][h]))) for k in range(T)]
+                         for p in range(N)]
         schedule = {k: [h for h in range(H) if m.evaluate(serve[h][k])] for k in range(T)}
-        attendees = {(h,k): [p for p in range(N) if m.evaluate(attend[p][k]).as_long() == h] for k in range(T) for h in range(H)}
-        meet_counts = { (i,j): m.evaluate(meet[(i,j)]).as_long() for (i,j) in meet.keys() }
+        attendees = {(h,k): [p for p in range(N) if attend_matrix[p][k] == h] for k in range(T) for h in range(H)}
+        meet_counts = { (i,j): sum(attend_matrix[i][k] == attend_matrix[j][k] for k in range(T)) for (i,j) in self.meet.keys() }
 
         return {
             "sat": True,
@@ -108,10 +135,13 @@ def solve_instance(require_p1=False, require_p2=False, require_p3=False, require
             "attendees": attendees,
             "meet_counts": meet_counts,
             "serve_matrix": [[is_true(m.evaluate(serve[h][k])) for k in range(T)] for h in range(H)],
-            "attend_matrix": [[m.evaluate(attend[p][k]).as_long() for k in range(T)] for p in range(N)],
+            "attend_matrix": attend_matrix,
         }
-    else:
-        return {"sat": False, "status": ok, "runtime": runtime}
+
+
+def solve_instance(require_p1=False, require_p2=False, require_p3=False, require_p4=False, timeout_ms=None, threads=None):
+    encoder = DinnerEncoder(timeout_ms=timeout_ms, threads=threads)
+    return encoder.solve(require_p1=require_p1, require_p2=require_p2, require_p3=require_p3, require_p4=require_p4)
 
 
 def print_solution(sol):
@@ -137,19 +167,22 @@ def print_solution(sol):
 
 
 if __name__ == "__main__":
+    # All scenarios share one encoding; only their property constraints differ
+    encoder = DinnerEncoder(timeout_ms=60000)
+
     # Scenario A1: property1 + property3
     print("=== Scenario A1: property1 (every pair meets at least once) + property3 (couples never meet outside their own houses) ===")
-    sol_a1 = solve_instance(require_p1=True, require_p3=True, require_p4=False, timeout_ms=60000)
+    sol_a1 = encoder.solve(require_p1=True, require_p3=True, require_p4=False)
     print_solution(sol_a1)
 
     # Scenario A2: property1 + property4
     print("\n=== Scenario A2: property1 + property4 (6 guests distinct per house) ===")
-    sol_a2 = solve_instance(require_p1=True, require_p3=False, require_p4=True, timeout_ms=60000)
+    sol_a2 = encoder.solve(require_p1=True, require_p3=False, require_p4=True)
     print_solution(sol_a2)
 
     # Scenario A3: property1 + property3 + property4
     print("\n=== Scenario A3: property1 + property3 + property4 (expected UNSAT) ===")
-    sol_a3 = solve_instance(require_p1=True, require_p3=True, require_p4=True, timeout_ms=60000)
+    sol_a3 = encoder.solve(require_p1=True, require_p3=True, require_p4=True)
     if sol_a3["sat"]:
         print("WARNING: Found a model (contradicts expected impossibility):")
         print_solution(sol_a3)
@@ -158,5 +191,5 @@ if __name__ == "__main__":
 
     # Scenario B: property2 + property3 + property4
     print("\n=== Scenario B: property2 (every pair meets at most 3 times) + property3 + property4 ===")
-    sol_b = solve_instance(require_p1=False, require_p2=True, require_p3=True, require_p4=True, timeout_ms=60000)
+    sol_b = encoder.solve(require_p1=False, require_p2=True, require_p3=True, require_p4=True)
     print_solution(sol_b)
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 """
 Finite State Automata Reachability Analysis using BDDs
-Compatible with OxiDD 0.10–0.12 (and likely newer)
+Compatible with OxiDD 0.13 (and likely newer)
 Includes detailed debug output similar to dd.autoref version
 Author: Adapted for TU/e 2IMF25 Assignment (Phoenix/Echoira)
 """
 
-from oxidd.bdd import BDDManager
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from oxidd.bdd import BDDFunction, BDDManager
+from oxidd.util import BooleanOperator
 
 
 class BAFileParser:
@@ -17,74 +21,57 @@ class BAFileParser:
         with open(filename, 'r', encoding='utf-8') as f:
             content = f.read().strip()
 
-        lines = content.split('\n')
         initial_state = None
-        transitions = []
-        all_states = set()
+        # Transitions are collected column-wise (src, action, dst)
+        srcs, actions, dsts = [], [], []
+        # State IDs are handed out in order of first appearance
         state_id_map = {}
-        next_state_id = 0
+        get_id = state_id_map.setdefault
 
-        for line in lines:
+        # Single pass with partition(): one split per line, no intermediate lists
+        for line in content.split('\n'):
             line = line.strip()
             if not line:
                 continue
 
             # First bracketed line is the initial state
-            if line.startswith('[') and initial_state is None:
+            if initial_state is None and line[0] == '[':
                 initial_state = line
-                state_id = BAFileParser._get_state_id(
-                    state_id_map, initial_state, next_state_id)
-                next_state_id += 1
-                all_states.add(state_id)
-
-            elif '->' in line:
-                parts = line.split('->')
-                if len(parts) == 2:
-                    left_side, right_side = parts[0].strip(), parts[1].strip()
-                    action = 0
-                    src_state = left_side
-
-                    if ',' in left_side:
-                        comma_parts = left_side.split(',', 1)
-                        if len(comma_parts) == 2 and comma_parts[0].strip() in ['0', '1']:
-                            action = int(comma_parts[0].strip())
-                            src_state = comma_parts[1].strip()
-
-                    dst_state = right_side
-                    src_id = BAFileParser._get_state_id(
-                        state_id_map, src_state, next_state_id)
-                    if src_id == next_state_id:
-                        next_state_id += 1
-                    all_states.add(src_id)
-
-                    dst_id = BAFileParser._get_state_id(
-                        state_id_map, dst_state, next_state_id)
-                    if dst_id == next_state_id:
-                        next_state_id += 1
-                    all_states.add(dst_id)
-
-                    transitions.append((src_id, action, dst_id))
-
-        accepting_states = set(all_states)
+                get_id(line, len(state_id_map))
+                continue
+
+            left_side, arrow, right_side = line.partition('->')
+            if not arrow or '->' in right_side:
+                continue
+            action = 0
+            src_state = left_side.strip()
+            if ',' in left_side:
+                prefix, _, rest = left_side.partition(',')
+                prefix = prefix.strip()
+                if prefix == '0' or prefix == '1':
+                    action = 1 if prefix == '1' else 0
+                    src_state = rest.strip()
+            dst_state = right_side.strip()
+
+            srcs.append(get_id(src_state, len(state_id_map)))
+            actions.append(action)
+            dsts.append(get_id(dst_state, len(state_id_map)))
+
+        states = list(range(len(state_id_map)))
+        accepting_states = list(states)
         initial_state_id = state_id_map.get(initial_state, 0)
-        states = sorted(all_states)
+        # N x 3 view of a 3 x N array: row k is (src, action, dst) and each column is contiguous
+        transitions = np.array([srcs, actions, dsts], dtype=np.int32).T
 
         print(f"Parsed: {len(states)} states, {len(transitions)} transitions")
         print(f"Initial state ID: {initial_state_id}")
         print(f"State ID range: {min(states)} to {max(states)}")
 
-        return FSA(states, [initial_state_id], transitions, list(accepting_states))
-
-    @staticmethod
-    def _get_state_id(state_id_map, state_repr, next_id):
-        if state_repr in state_id_map:
-            return state_id_map[state_repr]
-        state_id_map[state_repr] = next_id
-        return next_id
+        return FSA(states, [initial_state_id], transitions, accepting_states)
 
 
 class FSA:
-    """Finite State Automaton representation"""
+    """Finite State Automaton representation; transitions is an N x 3 (src, action, dst) array"""
     def __init__(self, states, initial, transitions, accepting):
         self.states = states
         self.initial = initial
@@ -95,48 +82,86 @@ class FSA:
 class BDDReachabilityAnalyzer:
     """BDD-based reachability analysis (OxiDD-compat, with rich debug)"""
 
-    def __init__(self, fsa):
+    def __init__(self, fsa, interleaved=True, verbose=False, threads=1):
         self.fsa = fsa
-        # Node/table sizes kept generous; tweak if memory constrained
-        self.bdd = BDDManager(1 << 20, 1 << 18, 1)
+        # Print BDD node counts during the analyses (debug only)
+        self.verbose = verbose
+        # Variable order: x0, y0, x1, y1, ... (interleaved) or x0, x1, ..., y0, y1, ...
+        self.interleaved = interleaved
+        # OxiDD's node table does not grow, so size it from the input: the
+        # per-group parts of T alone take about |transitions| * bits nodes
+        bits = max(1, max(fsa.states).bit_length())
+        node_hint = max(1 << 20, 2 * len(fsa.transitions) * bits)
+        # Opt-in: with threads > 1 the manager gets that many workers and the three
+        # analyses run concurrently (OxiDD releases the GIL inside operations).
+        # Their progress output then interleaves.
+        self.threads = threads
+        self.bdd = BDDManager(node_hint, node_hint >> 2, threads)
         self.state_vars = []
         self.next_state_vars = []
         self.action_var = None
+        # State cubes keyed by (state_idx, next_state), see _state_cube
+        self._cube_cache = {}
         self._setup_variables()
 
 
     def _get_bdd_size(self, bdd_obj):
-        """Return a simple complexity estimate for a BDD (OxiDD placeholder)."""
-        try:
-            return len(str(bdd_obj))  # 用表达式长度近似复杂度
-        except Exception:
-            return 0
+        """Return the number of BDD nodes below bdd_obj."""
+        return bdd_obj.node_count()
+
 
 
+    def _state_count(self, states):
+        """Number of states in a set over the x bits; the y bits and a are free."""
+        m = len(self.state_vars)
+        return states.sat_count(2 * m + 1) >> (m + 1)
 
     def _varset(self, vars_):
-        """Build a cube-like OR aggregation usable in .exist()."""
-        s = self.bdd.false()
+        """Build the conjunction of the variables, the variable-set form apply_exists() expects."""
+        s = self.bdd.true()
         for v in vars_:
-            s = s | v
+            s = s & v
         return s
 
-    def _encode_state(self, state_idx, vars_):
+    def _disjoin(self, funcs):
+        """OR the BDDs pairwise, level by level, so intermediate results stay small."""
+        funcs = list(funcs)
+        if not funcs:
+            return self.bdd.false()
+        while len(funcs) > 1:
+            paired = [funcs[k] | funcs[k + 1] for k in range(0, len(funcs) - 1, 2)]
+            if len(funcs) % 2:
+                paired.append(funcs[-1])
+            funcs = paired
+        return funcs[0]
+
+    def _encode_state(self, state_idx, literals):
+        """Cube of state_idx over literals[i] = (~bit_i, bit_i), see _setup_variables."""
         expr = self.bdd.true()
-        for i, var in enumerate(vars_):
-            bit = (state_idx >> i) & 1
-            expr = expr & (var if bit else ~var)
+        # Conjoin from the deepest bit up, so each AND only adds a node on top
+        for i in range(len(literals) - 1, -1, -1):
+            expr = expr & literals[i][(state_idx >> i) & 1]
         return expr
 
+    def _state_cube(self, state_idx, next_state=False):
+        """Memoized _encode_state over the current-state (x) or next-state (y) bits."""
+        key = (state_idx, next_state)
+        cube = self._cube_cache.get(key)
+        if cube is None:
+            cube = self._encode_state(state_idx, self._next_state_lits if next_state else self._state_lits)
+            self._cube_cache[key] = cube
+        return cube
+
     def _rename_y_to_x(self, func):
-        """Logical y→x rename using XNOR constraints + ∃y elimination (compat)."""
-        eq = self.bdd.true()
-        for x, y in zip(self.state_vars, self.next_state_vars):
-            eq = eq & ((x & y) | ((~x) & (~y)))  # XNOR
-        combined = func & eq
-        for y in self.next_state_vars:
-            combined = combined.exist(y)
-        return combined
+        """y→x rename via OxiDD's native substitution (func must not depend on x)."""
+        return func.substitute(self._y_to_x)
+
+    def _image(self, states, transition):
+        """Successors of states under transition, as a set over the x bits."""
+        # Relational product: x and a are quantified while conjoining, so the
+        # full states & transition BDD is never built
+        image = states.apply_exists(BooleanOperator.AND, transition, self._xa_cube)
+        return self._rename_y_to_x(image)
 
     # --------------------------- Variable setup ---------------------------
     def _setup_variables(self):
@@ -146,138 +171,167 @@ class BDDReachabilityAnalyzer:
         print(f"State range: 0 to {max_state}, need {m} bits")
 
         # Allocate variables in interleaved order: x0, y0, x1, y1, ...
-        self.state_vars = []
-        self.next_state_vars = []
+        # Keeping each x_i next to its y_i keeps the transition relation and the
+        # y->x rename small; the grouped order is only kept for comparison.
+        if self.interleaved:
+            names = [name for i in range(m) for name in (f"x{i}", f"y{i}")]
+        else:
+            names = [f"x{i}" for i in range(m)] + [f"y{i}" for i in range(m)]
+        # Add the action variable (0/1 transition)
+        names.append('a')
 
-        for i in range(m):
-            x = self.bdd.new_var()   # current-state bit
-            y = self.bdd.new_var()   # next-state bit
-            self.state_vars.append(x)
-            self.next_state_vars.append(y)
+        # Variables are allocated in list order, so the list is also the order
+        index = dict(zip(names, self.bdd.add_named_vars(names)))
+        self.state_vars = [self.bdd.var(index[f"x{i}"]) for i in range(m)]      # current-state bits
+        self.next_state_vars = [self.bdd.var(index[f"y{i}"]) for i in range(m)] # next-state bits
+        self.action_var = self.bdd.var(index['a'])
 
-        # Add the action variable (0/1 transition)
-        self.action_var = self.bdd.new_var()
+        # Negative/positive literal of every bit, indexed by the bit value
+        self._state_lits = [(~v, v) for v in self.state_vars]
+        self._next_state_lits = [(~v, v) for v in self.next_state_vars]
 
-        pseudo_names = []
-        for i in range(m):
-            pseudo_names.append(f"x{i}")
-            pseudo_names.append(f"y{i}")
-        pseudo_names.append('a')
+        # Built once so every rename reuses the same apply-cache entries
+        self._y_to_x = BDDFunction.make_substitution(
+            (index[f"y{i}"], x) for i, x in enumerate(self.state_vars))
+        # Variables quantified out of every image: current state bits and the action
+        self._xa_cube = self._varset(self.state_vars + [self.action_var])
 
         print(f"Using {m} bits to encode {len(self.fsa.states)} states")
-        print(f"Variables (interleaved): {pseudo_names}")
+        print(f"Variables ({'interleaved' if self.interleaved else 'grouped'}): {names}")
 
 
     # ------------------------ BDD builders & kernels ---------------------
     def build_transition_relation(self):
-        transition_bdd = self.bdd.false()
         total = len(self.fsa.transitions)
         print(f"Building transition relation with {total} transitions...")
 
-        for i, (src, action, dst) in enumerate(self.fsa.transitions):
+        # Group destinations by (src, action): each source cube is built and
+        # conjoined once per group instead of once per transition.
+        groups = self._group_transitions()
+
+        parts = []
+        for i, (src, action, dsts) in enumerate(groups):
             if i % 500 == 0:
-                print(f"  Processing transition {i}/{len(self.fsa.transitions)}...")
-            src_bdd = self._encode_state(src, self.state_vars)
+                print(f"  Processing transition group {i}/{len(groups)}...")
             action_bdd = self.action_var if action else ~self.action_var
-            dst_bdd = self._encode_state(dst, self.next_state_vars)
-            transition_bdd = transition_bdd | (src_bdd & action_bdd & dst_bdd)
+            dst_bdd = self._disjoin(self._state_cube(dst, next_state=True) for dst in dsts)
+            parts.append(self._state_cube(src) & action_bdd & dst_bdd)
+        # Groups are sorted by source, so neighbours in the reduction share state bits
+        transition_bdd = self._disjoin(parts)
 
         print("Transition relation built")
         return transition_bdd
 
+    def _group_transitions(self):
+        """(src, action, [dst, ...]) for every (src, action) pair, sorted by src then action."""
+        trans = self.fsa.transitions
+        if not len(trans):
+            return []
+        src, act, dst = trans[:, 0], trans[:, 1], trans[:, 2]
+        order = np.lexsort((act, src))
+        src, act, dst = src[order], act[order], dst[order]
+        starts = np.flatnonzero(np.r_[True, (src[1:] != src[:-1]) | (act[1:] != act[:-1])])
+        ends = np.r_[starts[1:], len(src)]
+        dst = dst.tolist()
+        return [(s, a, dst[lo:hi]) for s, a, lo, hi in
+                zip(src[starts].tolist(), act[starts].tolist(), starts.tolist(), ends.tolist())]
+
     def build_initial_states(self):
-        initial_bdd = self.bdd.false()
-        for state in self.fsa.initial:
-            initial_bdd = initial_bdd | self._encode_state(state, self.state_vars)
-        return initial_bdd
+        return self._disjoin(self._state_cube(state) for state in self.fsa.initial)
 
     def build_accepting_states(self):
-        accepting_bdd = self.bdd.false()
-        for state in self.fsa.accepting:
-            accepting_bdd = accepting_bdd | self._encode_state(state, self.state_vars)
-        return accepting_bdd
-
-    def transitive_closure(self, initial, transition, max_iter=100):
+        return self._disjoin(self._state_cube(state) for state in self.fsa.accepting)
+
+    def transitive_closure(self, initial, transition, accepting=None, max_iter=100):
+        # With accepting given, stop as soon as an accepting state is reached;
+        # the returned set is then only the part explored so far. With
+        # accepting = true that would happen before the first image, so the
+        # closure is computed in full instead.
+        if accepting is not None and accepting == self.bdd.true():
+            accepting = None
         reachable = initial
-        old_reachable = None
+        # Only states found in the previous step are imaged; older ones were
+        # already expanded, so their successors are in reachable
+        frontier = initial
         iterations = 0
 
         print("Computing transitive closure...")
 
-        while reachable != old_reachable and iterations < max_iter:
-            old_reachable = reachable
-            image = (reachable & transition).exist(
-                self._varset(self.state_vars + [self.action_var])
-            )
-            next_states = self._rename_y_to_x(image)
-            reachable = reachable | next_states
+        while frontier != self.bdd.false() and iterations < max_iter:
+            # Earlier frontiers were already checked, so testing the new one suffices
+            if accepting is not None and (frontier & accepting) != self.bdd.false():
+                print(f"Accepting state reached after {iterations} iterations")
+                return reachable
+            next_states = self._image(frontier, transition)
+            frontier = next_states & ~reachable
+            reachable = reachable | frontier
             iterations += 1
 
-            if iterations % 10 == 0:
-                size = self._get_bdd_size(reachable)
-                #print(f"  Iteration {iterations}, BDD complexity: {size}")
+            if self.verbose and iterations % 10 == 0:
+                print(f"  Iteration {iterations}, BDD nodes: {self._get_bdd_size(reachable)}")
 
         print(f"Transitive closure converged in {iterations} iterations")
         return reachable
 
     # ----------------------------- Analyses ------------------------------
-    def analyze_zero_transitions(self, T, I, F):
+    def analyze_zero_transitions(self, T_0, I, F):
         print("\n=== Analysis (i): Only 0-transitions ===")
-        T_0 = T & (~self.action_var)
-        t0_size = self._get_bdd_size(T_0)
-        # print(f"T_0 BDD complexity: {t0_size}")
+        if self.verbose:
+            print(f"T_0 BDD nodes: {self._get_bdd_size(T_0)}")
 
-        R_0 = self.transitive_closure(I, T_0)
+        R_0 = self.transitive_closure(I, T_0, F)
         reachable_accepting = R_0 & F
         is_reachable = reachable_accepting != self.bdd.false()
 
-        #print(f"R_0 BDD complexity: {self._get_bdd_size(R_0)}")
-        #print(f"Reachable accepting states BDD complexity: {self._get_bdd_size(reachable_accepting)}")
+        if self.verbose:
+            print(f"R_0 BDD nodes: {self._get_bdd_size(R_0)}")
+            print(f"Reachable accepting states BDD nodes: {self._get_bdd_size(reachable_accepting)}")
         print(f"Accepting states reachable via 0-transitions: {is_reachable}")
         return is_reachable, R_0
 
-    def analyze_one_transitions(self, T, I, F):
+    def analyze_one_transitions(self, T_1, I, F):
         print("\n=== Analysis (ii): Only 1-transitions ===")
-        T_1 = T & self.action_var
-        t1_size = self._get_bdd_size(T_1)
-        #print(f"T_1 BDD complexity: {t1_size}")
+        if self.verbose:
+            print(f"T_1 BDD nodes: {self._get_bdd_size(T_1)}")
 
-        R_1 = self.transitive_closure(I, T_1)
+        R_1 = self.transitive_closure(I, T_1, F)
         reachable_accepting = R_1 & F
         is_reachable = reachable_accepting != self.bdd.false()
 
-        #print(f"R_1 BDD complexity: {self._get_bdd_size(R_1)}")
-        #print(f"Reachable accepting states BDD complexity: {self._get_bdd_size(reachable_accepting)}")
-        #print(f"Accepting states reachable via 1-transitions: {is_reachable}")
+        if self.verbose:
+            print(f"R_1 BDD nodes: {self._get_bdd_size(R_1)}")
+            print(f"Reachable accepting states BDD nodes: {self._get_bdd_size(reachable_accepting)}")
+        print(f"Accepting states reachable via 1-transitions: {is_reachable}")
         return is_reachable, R_1
 
-    def analyze_alternating_transitions(self, T, I, F):
+    def analyze_alternating_transitions(self, T_0, T_1, I, F):
         print("\n=== Analysis (iii): Alternating 0-1-0... transitions ===")
-        T_0 = T & (~self.action_var)
-        T_1 = T & self.action_var
-
         S0, S1 = I, self.bdd.false()
-        old_S0, old_S1 = None, None
+        # Only states new in the previous step are imaged; older ones were
+        # already expanded (same scheme as transitive_closure)
+        frontier_0, frontier_1 = I, self.bdd.false()
         iterations = 0
         max_iter = 50
+        # As in transitive_closure, F = true would stop before the first image
+        stop_at = None if F == self.bdd.true() else F
 
         print("Computing alternating reachability...")
 
-        while (S0 != old_S0 or S1 != old_S1) and iterations < max_iter:
-            old_S0, old_S1 = S0, S1
-
-            S0_new = (S1 & T_0).exist(self._varset(self.state_vars + [self.action_var]))
-            S0_new = self._rename_y_to_x(S0_new)
+        while (frontier_0 != self.bdd.false() or frontier_1 != self.bdd.false()) and iterations < max_iter:
+            # The question is only whether F is hit, so stop at the first accepting state
+            if stop_at is not None and ((frontier_0 | frontier_1) & stop_at) != self.bdd.false():
+                break
 
-            S1_new = (S0 & T_1).exist(self._varset(self.state_vars + [self.action_var]))
-            S1_new = self._rename_y_to_x(S1_new)
-
-            S0 = S0 | S0_new
-            S1 = S1 | S1_new
+            frontier_0, frontier_1 = (
+                self._image(frontier_1, T_0) & ~S0,
+                self._image(frontier_0, T_1) & ~S1,
+            )
+            S0 = S0 | frontier_0
+            S1 = S1 | frontier_1
             iterations += 1
 
-            # Per-iteration debug (optional heavy): print sizes
-            if iterations % 5 == 0:
+            # Per-iteration debug: print sizes
+            if self.verbose and iterations % 5 == 0:
                 print(
                     f"  Iter {iterations}, S0 size = {self._get_bdd_size(S0)}, S1 size = {self._get_bdd_size(S1)}"
                 )
@@ -295,69 +349,42 @@ class BDDReachabilityAnalyzer:
         print("Building BDD representations...")
         T = self.build_transition_relation()
         I = self.build_initial_states()
-        F = self.build_accepting_states()
-
-        print("\nStarting reachability analyses...")
-
-        # === (i) Only 0-transitions ===
-        print("\n=== Analysis (i): Only 0-transitions ===")
-        T_0 = T & (~self.action_var)
-        t0_size = self._get_bdd_size(T_0)
-        #print(f"T_0 BDD complexity: {t0_size}")
-
-        print("Computing transitive closure...")
-        R_0 = self.transitive_closure(I, T_0)
-        r0_size = self._get_bdd_size(R_0)
-        reachable_accepting = R_0 & F
-        ra0_size = self._get_bdd_size(reachable_accepting)
-        is_reachable_0 = reachable_accepting != self.bdd.false()
-        #print(f"R_0 BDD complexity: {r0_size}")
-        #print(f"Reachable accepting states BDD complexity: {ra0_size}")
-        print(f"Accepting states reachable via 0-transitions: {is_reachable_0}")
-
-        # === (ii) Only 1-transitions ===
-        print("\n=== Analysis (ii): Only 1-transitions ===")
-        T_1 = T & self.action_var
-        t1_size = self._get_bdd_size(T_1)
-        #print(f"T_1 BDD complexity: {t1_size}")
-
-        print("Computing transitive closure...")
-        R_1 = self.transitive_closure(I, T_1)
-        r1_size = self._get_bdd_size(R_1)
-        reachable_accepting = R_1 & F
-        ra1_size = self._get_bdd_size(reachable_accepting)
-        is_reachable_1 = reachable_accepting != self.bdd.false()
-        #print(f"R_1 BDD complexity: {r1_size}")
-        #print(f"Reachable accepting states BDD complexity: {ra1_size}")
-        print(f"Accepting states reachable via 1-transitions: {is_reachable_1}")
-
-        # === (iii) Alternating transitions ===
-        print("\n=== Analysis (iii): Alternating 0-1-0... transitions ===")
+        every_state_accepts = len(self.fsa.accepting) == len(self.fsa.states)
+        if every_state_accepts:
+            # Every state accepts. Reachable sets only ever hold encodings of real
+            # states, so R & true == R & F and the OR over all state cubes is skipped.
+            F = self.bdd.true()
+            print("Every state is accepting, so each verdict only says that I is non-empty;"
+                  " the reachable sets are still computed in full for the cross-check.")
+        else:
+            F = self.build_accepting_states()
+        # The cubes are only needed while building T, I and F
+        self._cube_cache.clear()
+
+        # Split T by action once; every image step below works on T_0 or T_1 only
         T_0 = T & (~self.action_var)
         T_1 = T & self.action_var
 
-        print("Computing alternating reachability...")
-        S0, S1 = I, self.bdd.false()
-        old_S0, old_S1 = None, None
-        iterations = 0
-        max_iter = 50
-
-        while (S0 != old_S0 or S1 != old_S1) and iterations < max_iter:
-            old_S0, old_S1 = S0, S1
-            S0_new = (S1 & T_0).exist(self._varset(self.state_vars + [self.action_var]))
-            S0_new = self._rename_y_to_x(S0_new)
-            S1_new = (S0 & T_1).exist(self._varset(self.state_vars + [self.action_var]))
-            S1_new = self._rename_y_to_x(S1_new)
-            S0 = S0 | S0_new
-            S1 = S1 | S1_new
-            iterations += 1
-
-        reachable_0 = S0 & F
-        reachable_1 = S1 & F
-        is_reachable_alt = (reachable_0 | reachable_1) != self.bdd.false()
-        print(f"Accepting states reachable via alternating transitions: {is_reachable_alt}")
-
-
+        print("\nStarting reachability analyses...")
+        if self.threads > 1:
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                jobs = [
+                    pool.submit(self.analyze_zero_transitions, T_0, I, F),
+                    pool.submit(self.analyze_one_transitions, T_1, I, F),
+                    pool.submit(self.analyze_alternating_transitions, T_0, T_1, I, F),
+                ]
+                (is_reachable_0, R_0), (is_reachable_1, R_1), (is_reachable_alt, (S0, S1)) = [job.result() for job in jobs]
+        else:
+            is_reachable_0, R_0 = self.analyze_zero_transitions(T_0, I, F)
+            is_reachable_1, R_1 = self.analyze_one_transitions(T_1, I, F)
+            is_reachable_alt, (S0, S1) = self.analyze_alternating_transitions(T_0, T_1, I, F)
+
+        if every_state_accepts:
+            # No early exit ran, so these match the explicit counts below
+            # unless a fixpoint hit its iteration cap
+            print(f"\n[bdd] only-0: reachable_states={self._state_count(R_0)}")
+            print(f"[bdd] only-1: reachable_states={self._state_count(R_1)}")
+            print(f"[bdd] alternating: |S0|={self._state_count(S0)}, |S1|={self._state_count(S1)}")
 
         print("\n[explicit cross-check]")
         xc = explicit_reachability_checks(self.fsa)
@@ -372,67 +399,69 @@ class BDDReachabilityAnalyzer:
         }
 
 # ----- explicit (non-BDD) cross-checks -----
-def explicit_reachability_checks(fsa):
-    from collections import deque, defaultdict
+def _bfs(num_nodes, src, dst, starts):
+    """Frontier BFS over the edges src[k] -> dst[k]; returns the visited mask."""
+    # CSR adjacency: successors of u are dst_sorted[indptr[u]:indptr[u + 1]]
+    order = np.argsort(src, kind='stable')
+    dst_sorted = dst[order]
+    indptr = np.searchsorted(src[order], np.arange(num_nodes + 1))
+
+    visited = np.zeros(num_nodes, dtype=bool)
+    frontier = np.unique(starts)
+    visited[frontier] = True
+    while frontier.size:
+        # Gather all successors of the frontier in one shot
+        lo, hi = indptr[frontier], indptr[frontier + 1]
+        lens = hi - lo
+        offsets = np.repeat(lo - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+        succ = dst_sorted[offsets]
+        frontier = np.unique(succ[~visited[succ]])
+        visited[frontier] = True
+    return visited
+
 
+def explicit_reachability_checks(fsa):
         # 建图：分别为 action=0 / action=1
-    g0, g1 = defaultdict(list), defaultdict(list)
-    for s, a, t in fsa.transitions:
-        (g0 if a == 0 else g1)[s].append(t)
+    edges = fsa.transitions.astype(np.int64)
+    src, act, dst = edges[:, 0], edges[:, 1], edges[:, 2]
+    n = max([*fsa.states, *fsa.initial, *fsa.accepting, int(src.max(initial=-1)), int(dst.max(initial=-1))], default=-1) + 1
+    is0 = act == 0
+    src0, dst0, src1, dst1 = src[is0], dst[is0], src[~is0], dst[~is0]
 
-    initials = set(fsa.initial)
-    accepting = set(fsa.accepting)
+    initials = np.array(fsa.initial, dtype=np.int64)
+    accepting = np.zeros(n, dtype=bool)
+    accepting[np.array(fsa.accepting, dtype=np.int64)] = True
 
         # 统计一下 0/1 转移数，避免“看上去为 0”
-    n0 = sum(len(v) for v in g0.values())
-    n1 = sum(len(v) for v in g1.values())
+    n0, n1 = len(src0), len(src1)
     print(f"[explicit] #transitions: 0-edges={n0}, 1-edges={n1}")
 
         # ① 仅 0 转移
-    q, vis0 = deque(initials), set(initials)
-    while q:
-        u = q.popleft()
-        for v in g0.get(u, []):
-            if v not in vis0:
-                vis0.add(v); q.append(v)
-    r0_ok = len(vis0 & accepting) > 0
-    print(f"[explicit] only-0: reachable_states={len(vis0)}, accept_reachable={r0_ok}")
+    vis0 = _bfs(n, src0, dst0, initials)
+    r0_ok = bool((vis0 & accepting).any())
+    print(f"[explicit] only-0: reachable_states={int(vis0.sum())}, accept_reachable={r0_ok}")
 
         # ② 仅 1 转移
-    q, vis1 = deque(initials), set(initials)
-    while q:
-        u = q.popleft()
-        for v in g1.get(u, []):
-            if v not in vis1:
-                vis1.add(v); q.append(v)
-    r1_ok = len(vis1 & accepting) > 0
-    print(f"[explicit] only-1: reachable_states={len(vis1)}, accept_reachable={r1_ok}")
+    vis1 = _bfs(n, src1, dst1, initials)
+    r1_ok = bool((vis1 & accepting).any())
+    print(f"[explicit] only-1: reachable_states={int(vis1.sum())}, accept_reachable={r1_ok}")
 
         # ③ 交替 0-1-0…（按照你BDD版的逻辑，第一步是走“1”）
-        # 状态带上 parity：0层=经过偶数步（下一步尝试 1），1层=经过奇数步（下一步尝试 0）
-    q = deque([(s, 0) for s in initials])
-    seen = set((s, 0) for s in initials)
-    reach0, reach1 = set(initials), set()  # 分别对应 S0, S1
-    while q:
-        u, par = q.popleft()
-        if par == 0:   # 下一步用 1-edge
-            for v in g1.get(u, []):
-                st = (v, 1)
-                if st not in seen:
-                    seen.add(st); q.append(st); reach1.add(v)
-        else:          # 下一步用 0-edge
-            for v in g0.get(u, []):
-                st = (v, 0)
-                if st not in seen:
-                    seen.add(st); q.append(st); reach0.add(v)
-    alt_ok = (len(reach0 & accepting) > 0) or (len(reach1 & accepting) > 0)
-    print(f"[explicit] alternating: |S0|={len(reach0)}, |S1|={len(reach1)}, accept_reachable={alt_ok}")
+        # 状态带上 parity：节点 2v = (v, 0)（下一步尝试 1），节点 2v+1 = (v, 1)（下一步尝试 0）
+        # 1-edge: (s, 0) -> (t, 1)；0-edge: (s, 1) -> (t, 0)，一次 BFS 覆盖两层
+    par_src = np.concatenate((2 * src1, 2 * src0 + 1))
+    par_dst = np.concatenate((2 * dst1 + 1, 2 * dst0))
+    seen = _bfs(2 * n, par_src, par_dst, 2 * initials)
+    reach0, reach1 = seen[0::2], seen[1::2]  # 分别对应 S0, S1
+    alt_ok = bool((reach0 & accepting).any() or (reach1 & accepting).any())
+    s0, s1 = int(reach0.sum()), int(reach1.sum())
+    print(f"[explicit] alternating: |S0|={s0}, |S1|={s1}, accept_reachable={alt_ok}")
 
     return {
         "only0": r0_ok,
         "only1": r1_ok,
         "alt": alt_ok,
-        "counts": {"n0": n0, "n1": n1, "S0": len(reach0), "S1": len(reach1), "R0": len(vis0), "R1": len(vis1)},
+        "counts": {"n0": n0, "n1": n1, "S0": s0, "S1": s1, "R0": int(vis0.sum()), "R1": int(vis1.sum())},
         }
 
 
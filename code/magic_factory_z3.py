@@ -8,29 +8,55 @@ s = [Int(f"s_{i}") for i in range(8)]  # skipples
 c = [Int(f"c_{i}") for i in range(8)]  # crottles
 d = [Int(f"d_{i}") for i in range(8)]  # dupples
 cool = [Bool(f"cool_{i}") for i in range(8)]  # whether truck i is cooled
+has_p = [Bool(f"hp_{i}") for i in range(8)]  # whether truck i carries prittles
+has_c = [Bool(f"hc_{i}") for i in range(8)]  # whether truck i carries crottles
 
 opt = Optimize()
+# Stop proving optimality after this long and report the best model found so far
+opt.set("timeout", 60000)
 
 
+# Per-truck pallet count and weight, built once
+totals = [n[i] + p[i] + s[i] + c[i] + d[i] for i in range(8)]
+weights = [700*n[i] + 400*p[i] + 1000*s[i] + 2500*c[i] + 200*d[i] for i in range(8)]
+
+cs = []
 for i in range(8):
-    opt.add(n[i] >= 0, n[i] <= 1)            # at most 1 nuzzle per truck
-    opt.add(p[i] >= 0)                        # prittles non-negative
-    opt.add(s[i] >= 0)                        # skipples non-negative
-    opt.add(c[i] >= 0)                        # crottles non-negative
-    opt.add(d[i] >= 0)                        # dupples non-negative
-    opt.add(n[i]+p[i]+s[i]+c[i]+d[i] <= 8)   # max 8 pallets per truck
-    opt.add(700*n[i] + 400*p[i] + 1000*s[i] + 2500*c[i] + 200*d[i] <= 8000)  # max weight 8000 kg
-    opt.add(Implies(s[i] > 0, cool[i]))      # skipples only on cooled trucks
+    cs += [n[i] >= 0, n[i] <= 1,            # at most 1 nuzzle per truck
+           p[i] >= 0,                        # prittles non-negative
+           s[i] >= 0,                        # skipples non-negative
+           c[i] >= 0,                        # crottles non-negative
+           d[i] >= 0,                        # dupples non-negative
+           totals[i] <= 8,                   # max 8 pallets per truck
+           weights[i] <= 8000,               # max weight 8000 kg
+           Implies(s[i] > 0, cool[i])]       # skipples only on cooled trucks
 
+# Fleet-wide totals, built once and shared by the constraints and the objective
+sum_n, sum_p, sum_s, sum_c, sum_d = map(Sum, (n, p, s, c, d))
+cs += [sum_n == 4, sum_s == 8, sum_c == 10, sum_d == 20]
+cs.append(PbEq([(y, 1) for y in cool], 3))  # exactly 3 cooled trucks
+opt.add(*cs)
 
-opt.add(Sum(n) == 4, Sum(s) == 8, Sum(c) == 10, Sum(d) == 20)
-opt.add(Sum([If(y,1,0) for y in cool]) == 3)  # exactly 3 cooled trucks
+# Part (b): prittles and crottles cannot share a truck; the split is on the
+# Boolean indicators instead of an integer disjunction
+opt.add(*[has_p[i] == (p[i] >= 1) for i in range(8)])
+opt.add(*[has_c[i] == (c[i] >= 1) for i in range(8)])
+opt.add(*[Not(And(has_p[i], has_c[i])) for i in range(8)])
 
-# Part (b): prittles and crottles cannot share a truck
-opt.add([Or(p[i]==0, c[i]==0) for i in range(8)])
+# Symmetry breaking: trucks are interchangeable, so only consider assignments
+# with cooled trucks first and, within each group, loads in descending lex order
+def lex_ge(xs, ys):
+    """xs >= ys lexicographically, for equal-length lists of Int terms."""
+    result = xs[-1] >= ys[-1]
+    for x, y in zip(reversed(xs[:-1]), reversed(ys[:-1])):
+        result = Or(x > y, And(x == y, result))
+    return result
 
+loads = [[n[i], p[i], s[i], c[i], d[i]] for i in range(8)]
+opt.add(*[Implies(cool[i+1], cool[i]) for i in range(7)])
+opt.add(*[Implies(cool[i] == cool[i+1], lex_ge(loads[i], loads[i+1])) for i in range(7)])
 
-opt.maximize(Sum(p))
+opt.maximize(sum_p)
 
 
 start_time = time.perf_counter()
@@ -41,19 +67,26 @@ runtime = end_time - start_time
 print(f"Solver runtime (s): {runtime:.4f}")
 print(f"Solver status: {result}")
 
+model = None
 if result == sat:
     model = opt.model()
-    total_prittles = sum(model[p[i]].as_long() for i in range(8))
+elif result == unknown:
+    try:
+        model = opt.model()  # best model before the timeout, if any
+        print("Timed out; the assignment below is feasible but not proven optimal.")
+    except Z3Exception:
+        pass
+
+if model is not None:
+    # Read every truck's load from the model once; the total and the table reuse it
+    values = [[model.eval(v, model_completion=True).as_long() for v in load] for load in loads]
+    total_prittles = sum(load[1] for load in values)
     print(f"Total Prittles delivered: {total_prittles}\n")
     
     print("Truck assignments:")
     print("Truck | Nuzzles Prittles Skipples Crottles Dupples Total_Weight Cooling")
     for i in range(8):
-        n_val = model[n[i]].as_long()
-        p_val = model[p[i]].as_long()
-        s_val = model[s[i]].as_long()
-        c_val = model[c[i]].as_long()
-        d_val = model[d[i]].as_long()
+        n_val, p_val, s_val, c_val, d_val = values[i]
         total_weight = 700*n_val + 400*p_val + 1000*s_val + 2500*c_val + 200*d_val
         cool_val = model[cool[i]]
         print(f"{i+1:>5} | {n_val:>7} {p_val:>8} {s_val:>8} {c_val:>8} {d_val:>7} {total_weight:>12} {cool_val}")
@@ -1,6 +1,3 @@
-import itertools
-
-
 attendees = {
     (0,1): [1,2,3,4,6],
     (0,4): [0,5,7,8,9],
@@ -14,13 +11,17 @@ attendees = {
     (4,2): [3,4,5,6,9]
 }
 
-distinct_pairs = set()
+N = 10  # number of people
+
+# Pair (i, j) with i < j is bit i*N + j: row i of an N x N upper-triangular bit matrix.
+# Each room ORs in, for every member i, the members above i.
+pair_bits = 0
+for participants in attendees.values():
+    mask = sum(1 << p for p in participants)
+    for i in participants:
+        pair_bits |= (mask >> (i + 1) << (i + 1)) << (i * N)
 
-for (course, house), participants in attendees.items():
-    guests = [p for p in participants]
-    
-    for pair in itertools.combinations(guests, 2):
-        distinct_pairs.add(tuple(sorted(pair)))
+distinct_pairs = {(i, j) for i in range(N) for j in range(i + 1, N) if pair_bits >> (i * N + j) & 1}
 
-print("Number of distinct guest pairings:", len(distinct_pairs))
+print("Number of distinct guest pairings:", bin(pair_bits).count("1"))
 print("All distinct pairs:", distinct_pairs)
\ No newline at end of file
@@ -1,8 +1,11 @@
+import os
+
 # Import the bdd manager
 from oxidd.bdd import BDDManager
 
-# Create a new manager (which represents a shared diagram), which can hold up to 100 million nodes, has an apply cache of up to 1 million entries, and uses a single thread
-manager = BDDManager(100_000_000, 1_000_000, 1)
+# Create a new manager (which represents a shared diagram), which can hold up to 65536 nodes, has an apply cache of up to 4096 entries, and uses one worker thread per CPU core
+# (sized for this 3-variable example; larger problems need room for more nodes, e.g. 100_000_000 nodes and 1_000_000 cache entries)
+manager = BDDManager(1 << 16, 1 << 12, os.cpu_count() or 1)
 
 # Add variable layers to the shared diagram, and access the sub-diagrams representing each variable
 x = [manager.var(i) for i in manager.add_vars(3)]
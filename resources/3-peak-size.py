@@ -1,6 +1,9 @@
+import os
+
 from oxidd.bdd import BDDManager
 
-manager = BDDManager(100_000_000, 1_000_000, 1)
+# One worker thread per CPU core; the diagrams are canonical, so the result does not depend on it
+manager = BDDManager(100_000_000, 1_000_000, os.cpu_count() or 1)
 
 # Create all variables
 count = 12
@@ -10,18 +13,34 @@ x = [manager.var(i) for i in manager.add_named_vars(
 y = [manager.var(i) for i in manager.add_named_vars(
     ["y"+str(i) for i in reversed(range(count))])]
 
-# Create and visualize z
-acc = z[0]
-r = [(acc, "z")]
+def conjoin(z, x, y):
+    # Create and visualize z
+    acc = z[0]
+    r = [(acc, "z")]
+
+    # Add bi-implications and create diagrams for some
+    for i in range(count):
+        acc = acc & x[i].equiv(y[count-i-1])
+        r += [(acc, "xy"+str(i+1))]
 
-# Add bi-implications and create diagrams for some
-for i in range(count):
-    acc = acc & x[i].equiv(y[count-i-1])
-    r += [(acc, "xy"+str(i+1))]
+    # Create final diagram
+    acc = acc & ~z[0]
+    r += [(acc, "z & !z")]
+    return r
 
-# Create final diagram
-acc = acc & ~z[0]
-r += [(acc, "z & !z")]
+# With all x above all y the intermediate diagrams double in size with every step
+r = conjoin(z, x, y)
 
 # Create a single visualization with all intermediate diagrams
-manager.visualize_with_names("all", r)
\ No newline at end of file
+manager.visualize_with_names("all", r)
+
+# Comparison: the same conjunctions with each x next to its partner, z, x0, y0, x1, y1, ...
+# Interleaved, the intermediate diagrams only grow by a constant number of nodes per step.
+# The interleaved diagrams stay below 40 nodes, so a small second manager suffices
+interleaved = BDDManager(1 << 20, 1 << 16, os.cpu_count() or 1)
+names = ["z"] + [name for i in range(count) for name in ("x"+str(i), "y"+str(i))]
+v = [interleaved.var(i) for i in interleaved.add_named_vars(names)]
+# y keeps the reversed indexing above: y[count-i-1] is named "y<i>" and pairs with x[i]
+r = conjoin(v[:1], v[1::2], v[2::2][::-1])
+
+interleaved.visualize_with_names("interleaved", r)